@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 
 import sys
+import time
 
 from utils import Utils
 from player import Player
 from board import Board
+from transposition import TranspositionTable
+from capture import save_capture
+
+
+class SearchTimeout(Exception):
+    """Raised inside minimax when the AI's time limit for a move runs out"""
 
 
 class AI:
@@ -15,15 +22,54 @@ class AI:
         Player_num (int): The AI's number for the game (either 1 or 2)
         Positions (list): A list of tuples where each tuple is a line the AI has made
         Nick (str): The AI's nickname
+        Table (TranspositionTable): The transposition table used by minimax, or None
+        Depth (int): The number of levels minimax searches for each move, or None for no limit
+        Evaluator (Evaluator): The learned evaluation function for leaf nodes, or None
+        Time_limit (float): The number of seconds the AI may search for each move, or None
+        Clock (TimeManager): The game clock that decides how long each move may take, or None
+        Deadline (float): The time.perf_counter() value at which the current search stops
+        Slow_move (float): Moves that take more seconds than this are captured, or None
+        Capture_dir (str): The directory slow moves are captured to
+        Last_depth (int): The deepest search that finished for the last move (0 if none)
+        Nodes (int): The number of nodes the current search iteration has visited
+        Node_limit (int): The number of nodes after which a search iteration is stopped,
+                          or None; replay.py uses it to stop where a deadline did
+        Partial_nodes (int): The nodes the last move's unfinished iteration visited before
+                             it was stopped (0 if every iteration finished)
 
     """
 
-    def __init__(self, player_no, positions=[]):
+    def __init__(
+        self,
+        player_no,
+        positions=[],
+        table=None,
+        depth=4,
+        evaluator=None,
+        time_limit=None,
+        clock=None,
+        slow_move=None,
+        capture_dir="captures",
+    ):
         """Create a new AI object and initialize attributes
 
         Parameters:
             player_no (int): The AI's number for the game
             positions (list): The AI's current positions (default = [])
+            table (TranspositionTable): A transposition table to share search results
+                                        through (default = None)
+            depth (int): The number of levels to search for each move; None searches until
+                         the time runs out (default = 4)
+            evaluator (Evaluator): A learned evaluation function to add to the score
+                                   difference at leaf nodes (default = None)
+            time_limit (float): The number of seconds to search for each move; the search
+                                deepens one level at a time until the depth or the time
+                                limit is reached (default = None, no limit)
+            clock (TimeManager): A game clock to take each move's time limit from instead
+                                 of time_limit (default = None)
+            slow_move (float): The number of seconds after which a move counts as slow and
+                               its position is saved for replay.py (default = None, never)
+            capture_dir (str): The directory to save slow moves to (default = "captures")
 
         """
 
@@ -31,6 +77,18 @@ class AI:
         self.Player_num = player_no
         self.Positions = positions
         self.Nick = "AI"
+        self.Table = table
+        self.Depth = depth
+        self.Evaluator = evaluator
+        self.Time_limit = time_limit
+        self.Clock = clock
+        self.Deadline = None
+        self.Slow_move = slow_move
+        self.Capture_dir = capture_dir
+        self.Last_depth = 0
+        self.Nodes = 0
+        self.Node_limit = None
+        self.Partial_nodes = 0
 
     def minimax(
         self,
@@ -61,18 +119,96 @@ class AI:
         Return:
           [
             move (tuple): The (x,y) coordinates of the best move,
-            value (int): The score of the move; AI score - opponent score
+            value (int | float): The score of the move; AI score - opponent score,
+                                 plus the evaluator's estimate of the rest of the game
           ]
 
         """
 
-        moves = Utils.valid_moves(state)
+        if self.Deadline is not None and time.perf_counter() > self.Deadline:
+            raise SearchTimeout()
+
+        self.Nodes += 1
+        if self.Node_limit is not None and self.Nodes > self.Node_limit:
+            raise SearchTimeout()
+
         move = ()
 
+        # Leaves don't need their moves; the evaluator estimates 0 for a full board
+        if depth == 0:
+            v = self.get_score() - opponent.get_score()
+            if self.Evaluator is not None:
+                v += self.estimate([state], [maximize])[0]
+            return [move, v]
+
+        moves = Utils.valid_moves(state)
+
         # Terminal test
-        if len(moves) == 0 or depth == 0:
+        if len(moves) == 0:
             return [move, self.get_score() - opponent.get_score()]
 
+        # Search the most promising moves first so that more of the tree is pruned
+        moves = Utils.order_moves(state, moves)
+
+        # Reuse the result of an earlier search of this node if it is still usable
+        key = None
+        if self.Table is not None:
+            key = TranspositionTable.hash_state(
+                state,
+                maximize,
+                (
+                    self.get_score(),
+                    opponent.get_score(),
+                    ai_prev_score,
+                    player_prev_score,
+                ),
+            )
+            entry = self.Table.probe(key)
+            if entry is not None:
+                [d, v, m, flag] = entry
+                if (
+                    d == depth
+                    and m in moves
+                    and (
+                        flag == TranspositionTable.EXACT
+                        or (flag == TranspositionTable.LOWER and v > beta)
+                        or (flag == TranspositionTable.UPPER and v <= alpha)
+                    )
+                ):
+                    return [m, v + depth] if maximize else [m, v - depth]
+
+                # Otherwise the best move from the earlier search is tried first
+                if m in moves:
+                    moves.remove(m)
+                    moves.insert(0, m)
+
+        # With a learned evaluator, the leaves below the last ply are evaluated in one batch
+        if depth == 1 and self.Evaluator is not None:
+            children = []
+            values = []
+            ai_to_move = []
+            for m in moves:
+                s, completion = Utils.make_move(
+                    state,
+                    m,
+                    self if maximize else opponent,
+                    ai_prev_score,
+                    player_prev_score,
+                )
+                children.append(s)
+                values.append(self.get_score() - opponent.get_score())
+                ai_to_move.append(bool(completion) == maximize)
+            values = [
+                v + e for v, e in zip(values, self.estimate(children, ai_to_move))
+            ]
+
+            v = max(values) if maximize else min(values)
+            move = moves[values.index(v)]
+            if key is not None:
+                self.Table.store(key, depth, v, move, TranspositionTable.EXACT)
+            return [move, v + depth] if maximize else [move, v - depth]
+
+        alpha_orig, beta_orig = alpha, beta
         move = moves[0]
 
         if maximize:
@@ -108,6 +244,16 @@ class AI:
                 if alpha > beta:
                     break
 
+            # Record whether v is exact or only a bound before storing it
+            if key is not None:
+                if alpha > beta:
+                    flag = TranspositionTable.LOWER
+                elif v <= alpha_orig:
+                    flag = TranspositionTable.UPPER
+                else:
+                    flag = TranspositionTable.EXACT
+                self.Table.store(key, depth, v, good_move, flag)
+
             # Return the move and v+depth to incentivise earlier completions rather than later
             return [good_move, v + depth]
         else:
@@ -143,8 +289,36 @@ class AI:
                 if alpha > beta:
                     break
 
+            if key is not None:
+                if alpha > beta:
+                    flag = TranspositionTable.UPPER
+                elif v >= beta_orig:
+                    flag = TranspositionTable.LOWER
+                else:
+                    flag = TranspositionTable.EXACT
+                self.Table.store(key, depth, v, bad_move, flag)
+
             return [bad_move, v - depth]
 
+    def estimate(self, states, ai_to_move):
+        """Estimate how many more boxes the AI will win than its opponent in the rest of
+        each game using the learned evaluator
+
+        Parameters:
+            states (list): The game state objects to evaluate in one batch
+            ai_to_move (list): Whether it is the AI's turn in each state
+
+        Return:
+            estimates (list): The estimate for each state; all 0 without an evaluator
+
+        """
+
+        if self.Evaluator is None:
+            return [0] * len(states)
+
+        values = self.Evaluator.evaluate(states)
+        return [float(v if m else -v) for v, m in zip(values, ai_to_move)]
+
     def get_positions(self):
         """Get the list of moves the AI has made
 
@@ -176,14 +350,74 @@ class AI:
         return self.Score
 
     def get_move(self, state, opp):
-        """Get the AI's move selection by calling the minimax algorithm
+        """Get the AI's move selection, saving the position if the move is slow
+
+        Parameters:
+            state (dict): The current game state
+            opp (Player): The opposing player object
+
+        Return:
+          [
+            move (tuple): The coordinates of the move the AI wants to make,
+            value (int | float): The score of the move from minimax
+          ]
+
+        """
+
+        # Record the settings before the search changes the clock
+        settings = self.get_settings(opp)
+        start = time.perf_counter()
+
+        move = self.search(state, opp)
+
+        elapsed = time.perf_counter() - start
+        if self.Slow_move is not None and elapsed > self.Slow_move:
+            # The depth reached and the nodes of the unfinished iteration are recorded so
+            # the search can be replayed without a deadline
+            settings["completed_depth"] = self.Last_depth
+            settings["partial_nodes"] = self.Partial_nodes
+            save_capture(self.Capture_dir, state, settings, elapsed, move[0])
+
+        return move
+
+    def get_settings(self, opp):
+        """Get the scores and settings that determine how the AI searches a position
+
+        Parameters:
+            opp (Player): The opposing player object
+
+        Return:
+            settings (dict): The AI's player number, both scores and the search settings
+
+        """
+
+        clock = None
+        if self.Clock is not None:
+            clock = [self.Clock.Remaining, self.Clock.Increment]
+
+        return {
+            "ai_player": self.get_player_num(),
+            "ai_score": self.get_score(),
+            "opp_score": opp.get_score(),
+            "depth": self.Depth,
+            "time_limit": self.Time_limit,
+            "clock": clock,
+            "weights": None if self.Evaluator is None else self.Evaluator.File,
+            "table": self.Table is not None,
+        }
+
+    def search(self, state, opp):
+        """Search for the AI's move by calling the minimax algorithm
 
         Parameters:
             state (dict): The current game state
             opp (Player): The opposing player object
 
         Return:
-            move (tuple): The coordinates of the move the AI wants to make
+          [
+            move (tuple): The coordinates of the move the AI wants to make,
+            value (int | float): The score of the move from minimax
+          ]
 
         """
 
@@ -191,14 +425,57 @@ class AI:
         prev_score = self.get_score()
         opp_score = opp.get_score()
 
-        # Call minimax to get the best move - can change the depth to what is needed
-        depth = 4
-        move = self.minimax(state, depth, opp, prev_score, opp_score)
-
-        # Reset the players' scores after the minimax call
-        self.set_score(prev_score)
-        opp.set_score(opp_score)
+        self.Last_depth = 0
+        self.Partial_nodes = 0
+        start = time.perf_counter()
+        moves = Utils.order_moves(state, Utils.valid_moves(state))
+        move = [moves[0] if moves else (), 0]
+
+        # A move with no alternative is played without searching
+        if len(moves) <= 1:
+            if self.Clock is not None:
+                self.Clock.spend(time.perf_counter() - start)
+            return move
+
+        # The soft limit stops further deepening, the hard limit stops the search
+        soft = hard = self.Time_limit
+        if self.Clock is not None:
+            soft, hard = self.Clock.allocate(state, moves)
+        if hard is not None:
+            self.Deadline = start + hard
+
+        # With a time limit, deepen one level at a time and keep the deepest finished result
+        last = len(moves) if self.Depth is None else self.Depth
+        first = last if hard is None else 1
+        for depth in range(first, last + 1):
+            self.Nodes = 0
+            try:
+                result = self.minimax(state, depth, opp, prev_score, opp_score)
+            except SearchTimeout:
+                self.Partial_nodes = self.Nodes
+                break
+            finally:
+                # Reset the players' scores after the minimax call
+                self.set_score(prev_score)
+                opp.set_score(opp_score)
+
+            changed = depth > first and result[0] != move[0]
+            move = result
+            self.Last_depth = depth
+
+            if soft is not None:
+                # A change of mind means the position needs more time
+                if changed and self.Clock is not None:
+                    soft = self.Clock.extend(soft, hard)
+
+                # The next iteration takes several times longer than this one, so it
+                # is not started once half of the soft limit is used up
+                if time.perf_counter() - start > soft / 2:
+                    break
 
+        self.Deadline = None
+        if self.Clock is not None:
+            self.Clock.spend(time.perf_counter() - start)
         return move
 
     def get_player_num(self):
@@ -223,19 +500,53 @@ class AI:
 
 
 # If the ai.py file is being executed as main, output a single move for the AI
-# given the name of a file containing a game state as a command-line argument
+# given the name of a file containing a game state as a command-line argument.
+# An optional transposition table file (-t) is warm-started from and saved back to,
+# and optional evaluator weights (-w) are loaded for the leaf evaluation.
+# With -s, the move is captured for replay.py if it takes longer than that many seconds.
 if __name__ == "__main__":
     # Usage clause
-    if len(sys.argv) != 2:
-        print(f"Usage: {sys.argv[0]} <state file>")
+    args = sys.argv[2:]
+    options = dict(zip(args[::2], args[1::2]))
+    if (
+        len(sys.argv) < 2
+        or len(args) % 2 == 1
+        or not set(options).issubset({"-t", "-w", "-s"})
+    ):
+        print(
+            f"Usage: {sys.argv[0]} <state file> [-t table file] [-w weights file] "
+            "[-s slow move seconds]"
+        )
         sys.exit(0)
 
     s = Utils.read_state_file(sys.argv[1])
 
-    ai = AI("p2", s[2])
-    player = Player("p1", s[1])
-    B = Board(s["board_size"][0])
+    evaluator = None
+    if "-w" in options:
+        from evaluator import Evaluator
+
+        evaluator = Evaluator.load(options["-w"])
+
+    table = None
+    if "-t" in options:
+        try:
+            table = TranspositionTable.load_or_create(
+                options["-t"], s["board_size"], evaluator
+            )
+        except ValueError as err:
+            print(err)
+            sys.exit(0)
+
+    slow_move = float(options["-s"]) if "-s" in options else None
+
+    ai = AI(2, s[2], table, evaluator=evaluator, slow_move=slow_move)
+    player = Player(1, s[1])
+    B = Board(s["board_size"])
     B.update(s)
     print(B)
     [move, v] = ai.get_move(s, player)
-    print("AI would choose move:", move)
\ No newline at end of file
+    print("AI would choose move:", move)
+
+    if table is not None:
+        table.save(options["-t"], s["board_size"], evaluator)
+        table.close()
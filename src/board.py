@@ -1,22 +1,77 @@
+import sys
+
+
 class Board:
     """Class to represent the Dots and Boxes game board
 
+    The board keeps a precomputed character grid of 6 character cells, one for every
+    even column of every row, and only redraws the cells touched by new lines.
+
     Attributes:
-        size (int): The size of the board
+        size (list): The size of the board in boxes - [x_dim, y_dim]
         state (dict): The game state that the board uses for display purposes
+        ansi (bool): Whether draw() redraws the board in place with ANSI escape codes
+        header (str): The rendered column label row
+        grid (list): The cells of every row of the board
+        rows (list): The rendered string of every row of the board
+        lines (dict): The player number that drew each line on the board
+        drawn (bool): Whether a frame has been drawn yet
 
     """
 
-    def __init__(self, size=4):
+    # Escape codes to clear the screen, move the cursor to the top left corner and
+    # clear from the cursor to the end of the screen
+    CLEAR = "\x1b[2J"
+    HOME = "\x1b[H"
+    CLEAR_BELOW = "\x1b[J"
+
+    def __init__(self, size=4, ansi=False):
         """Initialize a new board object; Initialize the board's attributes
 
         Parameters:
-            size (int): The desired size of the board - default=4
+            size (int | list): The desired size of the board; either a single
+                               dimension for a square board or [x_dim, y_dim] - default=4
+            ansi (bool): Redraw the board in place in draw() instead of printing
+                         a new board below the last one - default=False
 
         """
 
-        self.size = size
+        self.size = [size, size] if isinstance(size, int) else list(size)
         self.state = {}
+        self.ansi = ansi
+        self.drawn = False
+
+        # Add the top x-axis labels
+        self.header = "{:2}".format("")  # Add the offset to the column label row
+        for x in range(0, (self.size[0] * 2) + 1):
+            self.header += "{x:>3}".format(x=x)
+        self.header += "\n" * 2
+
+        self.reset()
+
+    def reset(self):
+        """Clear every line from the board"""
+
+        self.lines = {}
+        self.grid = []
+        for row in range(0, (self.size[1] * 2) + 1):
+            cell = "{:6}".format("*" if row % 2 == 0 else "")
+            self.grid.append([cell] * (self.size[0] + 1))
+
+        self.rows = [self.render_row(row) for row in range(0, len(self.grid))]
+
+    def render_row(self, row):
+        """Compute the string for one row of the board from its cells
+
+        Parameters:
+            row (int): The row number
+
+        Return:
+            res (str): The row's label and cells
+
+        """
+
+        return "{row_num:<4}".format(row_num=row) + "".join(self.grid[row]) + "\n" * 2
 
     def __str__(self):
         """Compute and return a string representation of the board object
@@ -26,43 +81,107 @@ class Board:
 
         """
 
-        res = ""
-
-        # Combine both players' moves into one set
-        lines = set(self.state[1]) | set(self.state[2])
-
-        # Add the top x-axis labels to the result string
-        res += "{:2}".format("")  # Add the offset to the column label row
-        for x in range(0, (self.size * 2) + 1):
-            res += "{x:>3}".format(x=x)
-        res += "\n" * 2
-
-        # Add the rest of the grid to the result string
-        label = 0
-        for row in range(0, (self.size * 2) + 1):
-            # Add the row labels to the string
-            res += "{row_num:<4}".format(row_num=row)
-            for col in range(0, (self.size * 2) + 1):
-                if col % 2 == 0 and row % 2 == 1 and (col, row) not in lines:
-                    res += "{:6}".format("")
-                if (col, row) in lines:
-                    if col % 2 == 0 and row % 2 == 1:
-                        res += "{:6}".format("|")
-                    elif col % 2 == 1 and row % 2 == 0:
-                        res += "-----"
-                elif (col + 1, row) in lines and row % 2 == 0:
-                    res += "*"
-                elif col % 2 == 0 and row % 2 == 0:
-                    res += "{:6}".format("*")
-            res += "\n" * 2
-        return res
+        return self.header + "".join(self.rows)
 
     def update(self, state):
-        """Update the board with a new game state
+        """Update the board with a new game state, redrawing only the cells of new lines
 
         Parameters:
             state (dict): The new game state object
 
         """
 
-        self.state = state
\ No newline at end of file
+        self.state = state
+        new = {}
+        for player_num in (1, 2):
+            for line in state[player_num]:
+                if line not in self.lines:
+                    new[line] = player_num
+
+        # If lines were taken away this is a different game, so start from scratch
+        if len(self.lines) + len(new) != len(state[1]) + len(state[2]):
+            self.reset()
+            self.update(state)
+            return
+
+        self.lines.update(new)
+        touched = set()
+        owners = {}
+
+        for (x, y), player_num in new.items():
+            if x % 2 == 1:
+                # Horizontal line: the cell of the dot to its left
+                self.grid[y][x // 2] = "*-----"
+                boxes = [(x, y - 1), (x, y + 1)]
+            else:
+                # Vertical line: the cell it starts
+                self.grid[y][x // 2] = "|" + self.grid[y][x // 2][1:]
+                boxes = [(x - 1, y), (x + 1, y)]
+            touched.add(y)
+
+            # Record who completed any box this line finished
+            for bx, by in boxes:
+                if self.is_box(bx, by) and all(
+                    side in self.lines for side in Board.sides(bx, by)
+                ):
+                    owners.setdefault((bx, by), set()).add(player_num)
+
+        # Fill each completed box with its owner's number; "?" if new lines from both
+        # players finished it and the owner can't be told
+        for (bx, by), players in owners.items():
+            owner = str(players.pop()) if len(players) == 1 else "?"
+            cell = self.grid[by][bx // 2]
+            self.grid[by][bx // 2] = cell[0] + "{:^5}".format(owner)
+            touched.add(by)
+
+        for row in touched:
+            self.rows[row] = self.render_row(row)
+
+    def is_box(self, x, y):
+        """Check that (x,y) is the center of a box on the board
+
+        Parameters:
+            x (int): The x coordinate
+            y (int): The y coordinate
+
+        Return:
+            True if (x,y) is the center of a box on the board, otherwise False
+
+        """
+
+        return 0 < x < self.size[0] * 2 and 0 < y < self.size[1] * 2
+
+    def sides(x, y):
+        """Get the four lines around a box
+
+        Parameters:
+            x (int): The x coordinate of the box's center
+            y (int): The y coordinate of the box's center
+
+        Return:
+            sides (list): The (x,y) coordinates of the box's four lines
+
+        """
+
+        return [(x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)]
+
+    def draw(self, status="", out=None):
+        """Write the board and a status message as a single buffered frame
+
+        Parameters:
+            status (str): Text to write below the board (default = "")
+            out (file): The stream to write to (default = sys.stdout)
+
+        """
+
+        out = sys.stdout if out is None else out
+        frame = str(self) + status
+
+        # In ANSI mode the frame overwrites the last one and clears what was below it
+        if self.ansi:
+            start = Board.HOME if self.drawn else Board.CLEAR + Board.HOME
+            frame = start + frame + Board.CLEAR_BELOW
+
+        out.write(frame)
+        out.flush()
+        self.drawn = True
@@ -0,0 +1,71 @@
+import itertools
+import json
+import os
+import time
+
+from utils import Utils
+
+# Numbers the captures made by this process so their file names never collide
+_counter = itertools.count()
+
+
+def save_capture(directory, state, settings, elapsed, move):
+    """Save a slow move's position and engine settings so it can be replayed later
+
+    The position is written as a state file (see Utils.read_state_file) and everything
+    else goes into a JSON sidecar file next to it with the same name.
+
+    Parameters:
+        directory (str): The directory to write the capture files to
+        state (dict): The game state the move was searched from
+        settings (dict): The AI's scores and settings from before the search
+        elapsed (float): The number of seconds the move took
+        move (tuple): The move the AI chose
+
+    Return:
+        file (str): The name of the state file that was written
+
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    name = "slow-{}-{}-{}".format(
+        time.strftime("%Y%m%d-%H%M%S"), os.getpid(), next(_counter)
+    )
+    file = os.path.join(directory, name + ".txt")
+
+    Utils.write_state_file(file, state)
+
+    sidecar = dict(settings)
+    sidecar.update(
+        {
+            "player": state["player"],
+            "elapsed": elapsed,
+            "move": list(move),
+        }
+    )
+    with open(os.path.join(directory, name + ".json"), "w") as f:
+        json.dump(sidecar, f, indent=2)
+
+    return file
+
+
+def load_capture(file):
+    """Load a capture written by save_capture()
+
+    Parameters:
+        file (str): The name of the capture's state file
+
+    Return:
+        state (dict): The game state the move was searched from
+        sidecar (dict): The AI's scores and settings, the time taken and the move chosen
+
+    """
+
+    state = Utils.read_state_file(file)
+
+    with open(os.path.splitext(file)[0] + ".json") as f:
+        sidecar = json.load(f)
+
+    # The state file only implies whose turn it is, so the recorded turn is used
+    state["player"] = sidecar["player"]
+    return state, sidecar
@@ -0,0 +1,132 @@
+from player import Player
+from utils import Utils
+
+
+class TimeManager:
+    """Class to represent a player's game clock and decide how long each move may take
+
+    Attributes:
+        Remaining (float): The number of seconds left on the clock
+        Increment (float): The number of seconds added to the clock after every move
+
+    """
+
+    # Share of the per-move budget spent in each kind of position
+    CAPTURE_FACTOR = 0.25
+    OPENING_FACTOR = 0.75
+    SAFE_RUNNING_OUT_FACTOR = 1.5
+    ENDGAME_FACTOR = 2.0
+
+    # With at least this many boxes to take in a row, the decision to decline the last
+    # two of a chain or four of a loop is still moves away, so the capture is forced
+    FORCED_CAPTURES = 5
+
+    # Positions with this many safe moves or fewer are near the end of the safe phase
+    FEW_SAFE_MOVES = 4
+
+    # The hard limit is at most this many times the soft limit ...
+    HARD_FACTOR = 4.0
+    # ... and never more than this share of the time left on the clock
+    MAX_SHARE = 0.25
+
+    # How much the soft limit grows when the best move changes between iterations
+    INSTABILITY_FACTOR = 1.5
+
+    # Never plan for fewer moves than this, so the clock is not spent too early
+    MIN_MOVES_LEFT = 4
+
+    def __init__(self, total, increment=0):
+        """Create a new game clock
+
+        Parameters:
+            total (float): The number of seconds for the whole game
+            increment (float): The number of seconds added after every move (default = 0)
+
+        """
+
+        self.Remaining = total
+        self.Increment = increment
+
+    def allocate(self, state, moves):
+        """Decide how long to search for the next move
+
+        Parameters:
+            state (dict): The current game state object
+            moves (list): The valid moves in the game state
+
+        Return:
+            soft (float): The number of seconds after which no new iteration should be started
+            hard (float): The number of seconds after which the search is stopped
+
+        """
+
+        # Each player makes roughly half of the remaining moves
+        moves_left = max(len(moves) / 2, TimeManager.MIN_MOVES_LEFT)
+        base = (self.Remaining / moves_left) + self.Increment
+
+        # Spend little on forced captures, more as the safe moves run out and the
+        # most in the endgame, where the choice of sacrifice decides the game
+        captures, safe, _ = Utils.classify_moves(state, moves)
+        if len(captures) == len(moves) or (
+            TimeManager.boxes_in_a_row(state, captures) >= TimeManager.FORCED_CAPTURES
+        ):
+            soft = base * TimeManager.CAPTURE_FACTOR
+        elif len(safe) == 0:
+            soft = base * TimeManager.ENDGAME_FACTOR
+        elif len(safe) <= TimeManager.FEW_SAFE_MOVES:
+            soft = base * TimeManager.SAFE_RUNNING_OUT_FACTOR
+        else:
+            soft = base * TimeManager.OPENING_FACTOR
+
+        hard = min(
+            soft * TimeManager.HARD_FACTOR, self.Remaining * TimeManager.MAX_SHARE
+        )
+        return min(soft, hard), hard
+
+    def boxes_in_a_row(state, captures):
+        """Count the boxes the player to move can take one after another, up to
+        FORCED_CAPTURES
+
+        Parameters:
+            state (dict): The current game state object
+            captures (list): The moves that complete a box in the game state
+
+        Return:
+            boxes (int): The number of boxes that can be taken before a move that
+                         completes nothing has to be made
+
+        """
+
+        boxes = 0
+        while len(captures) > 0 and boxes < TimeManager.FORCED_CAPTURES:
+            state, completions = Utils.make_move(
+                state, captures[0], Player(state["player"]), 0, 0
+            )
+            boxes += completions
+            captures, _, _ = Utils.classify_moves(state, Utils.valid_moves(state))
+
+        return boxes
+
+    def extend(self, soft, hard):
+        """Give the search more time because its best move changed between iterations
+
+        Parameters:
+            soft (float): The current soft limit
+            hard (float): The hard limit
+
+        Return:
+            soft (float): The new soft limit, never above the hard limit
+
+        """
+
+        return min(soft * TimeManager.INSTABILITY_FACTOR, hard)
+
+    def spend(self, elapsed):
+        """Take the time used for a move off the clock and add the increment
+
+        Parameters:
+            elapsed (float): The number of seconds the move took
+
+        """
+
+        self.Remaining = max(self.Remaining - elapsed, 0) + self.Increment
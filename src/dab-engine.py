@@ -5,8 +5,12 @@ from ai import AI
 from player import Player
 from utils import Utils
 from board import Board
+from clock import TimeManager
 import sys
 
+# Seconds the AI may search for each move; keeps large boards playable
+AI_TIME_LIMIT = 10
+
 
 def play_game(B: Board, state, player: Player, ai: AI):
     """Execute the main game loop for Dots and Boxes
@@ -25,7 +29,7 @@ def play_game(B: Board, state, player: Player, ai: AI):
 
     curr_player = player if player.get_player_num() == 1 else ai
     other_player = player if player.get_player_num() == 2 else ai
-    print(B)
+    B.draw()
 
     # Main loop to run the game; run until the game is over
     while True:
@@ -38,12 +42,12 @@ def play_game(B: Board, state, player: Player, ai: AI):
                 state
             )  # Comment to enable randome player & uncomment below line
             # move = curr_player.get_random_move(state) # Uncomment to enable the random player & comment above line
-            print(f"Player made a line at {move}")
+            status = f"Player made a line at {move}\n"
 
         # Calculate AI move
         else:
             [move, move_score] = curr_player.get_move(state, other_player)
-            print(f"AI made a line at {move}")
+            status = f"AI made a line at {move}\n"
 
         ai_prev_score = 0
         player_prev_score = 0
@@ -73,19 +77,19 @@ def play_game(B: Board, state, player: Player, ai: AI):
             curr_player.set_score(player_prev_score + completions)
             other_player.set_score(ai_prev_score)
 
-        # If a completion was made, print a message stating such
+        # If a completion was made, add a message stating such
         if completions > 0:
-            print("-->A completion was made!")
+            status += "-->A completion was made!\n"
 
         # If there was no completion made, switch to the next player's turn
         else:
             curr_player, other_player = other_player, curr_player
             state["player"] = 1 if state["player"] == 2 else 2
 
-        # Print out the reuslts of the last move
-        print(f"Player: {player.get_score()} | AI: {ai.get_score()}\n")
+        # Draw the board with the results of the last move below it in one write
+        status += f"Player: {player.get_score()} | AI: {ai.get_score()}\n\n"
         B.update(state)
-        print(B)
+        B.draw(status)
 
     # Print out the game's final scores
     print("\n\nFinal Scores:\n")
@@ -96,8 +100,23 @@ def main():
     """Main function for the game engine; Collect the CLAs and start the game"""
 
     # Verify command-line argument count
-    if len(sys.argv) != 3:
-        print(f"Usage: {sys.argv[0]} <player num> <board size>")
+    # The --ansi flag redraws the board in place instead of scrolling
+    ansi = "--ansi" in sys.argv
+    if ansi:
+        sys.argv.remove("--ansi")
+
+    # The --slow <seconds> option captures AI moves that take longer for replay.py
+    slow_move = None
+    if "--slow" in sys.argv:
+        i = sys.argv.index("--slow")
+        slow_move = float(sys.argv[i + 1])
+        del sys.argv[i : i + 2]
+
+    if not (3 <= len(sys.argv) <= 5):
+        print(
+            f"Usage: {sys.argv[0]} [--ansi] [--slow seconds] <player num> "
+            "<board size (N or MxN)> [AI game seconds] [AI increment seconds]"
+        )
         exit(-1)
 
     # Determine if the human player will be player 1 or 2
@@ -109,29 +128,40 @@ def main():
     # Set the AIs player number to what the player's number is not
     AI_NUM = 1 if P_NUM == 2 else 2
 
-    # Create the board object
-    BOARD_SIZE = int(sys.argv[2])
-    if not (BOARD_SIZE > 2 and BOARD_SIZE < 7):
-        print("ERROR: board size must be between 3-6 inclusive.")
+    # Create the board object; a single dimension makes a square board
+    dims = sys.argv[2].lower().split("x")
+    if len(dims) == 1:
+        dims = dims * 2
+    if not (
+        len(dims) == 2
+        and all(d.isdigit() and int(d) > 1 and int(d) < 13 for d in dims)
+    ):
+        print("ERROR: board dimensions must be between 2-12 inclusive.")
         exit(-1)
-    B = Board(BOARD_SIZE)
+    BOARD_SIZE = [int(d) for d in dims]
+    B = Board(BOARD_SIZE, ansi)
 
-    # Create an AI player
-    ai = AI(AI_NUM)
+    # Create an AI player; with a game clock it manages its own time for each move
+    if len(sys.argv) > 3:
+        increment = float(sys.argv[4]) if len(sys.argv) == 5 else 0
+        clock = TimeManager(float(sys.argv[3]), increment)
+        ai = AI(AI_NUM, depth=None, clock=clock, slow_move=slow_move)
+    else:
+        ai = AI(AI_NUM, time_limit=AI_TIME_LIMIT, slow_move=slow_move)
 
     # Create a human player
     player = Player(P_NUM)
 
     # Create an initial game state
     state = {
-        "board_size": [BOARD_SIZE, BOARD_SIZE],
+        "board_size": BOARD_SIZE,
         "player": 1,
         P_NUM: player.get_positions(),
         AI_NUM: ai.get_positions(),
     }
     B.update(state)
     print("Game Created...")
-    print(f"Board Size: {BOARD_SIZE}")
+    print(f"Board Size: {BOARD_SIZE[0]}x{BOARD_SIZE[1]}")
     print(f"P_NUM: {P_NUM}")
     print(f"AI_NUM: {AI_NUM}")
     print(f"Starting State: {state}")
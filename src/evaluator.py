@@ -0,0 +1,268 @@
+import hashlib
+
+import numpy as np
+
+from utils import Utils
+
+
+class Evaluator:
+    """Class to represent a learned evaluation function for the AI's leaf nodes
+
+    The evaluator predicts how many more boxes the player to move will win than
+    their opponent from the given position until the end of the game. Features
+    are computed from the edge/box state and are normalized by the size of the
+    board, so the same weights can be used on any board size.
+
+    Attributes:
+        Hidden (int): The number of hidden units; 0 makes the evaluator linear
+        W1 (np.ndarray): The weights of the first layer
+        b1 (np.ndarray): The biases of the first layer
+        W2 (np.ndarray): The weights of the output layer (None if linear)
+        b2 (np.ndarray): The biases of the output layer (None if linear)
+        File (str): The file the weights were loaded from (None if not loaded)
+
+    """
+
+    FEATURES = 7
+
+    def __init__(self, hidden=16, seed=0):
+        """Create a new evaluator with randomly initialized weights
+
+        Parameters:
+            hidden (int): The number of hidden units; 0 for a linear evaluator (default = 16)
+            seed (int): The seed for the weight initialization (default = 0)
+
+        """
+
+        rng = np.random.default_rng(seed)
+        self.Hidden = hidden
+        self.File = None
+
+        if hidden == 0:
+            self.W1 = np.zeros((Evaluator.FEATURES, 1))
+            self.b1 = np.zeros(1)
+            self.W2 = None
+            self.b2 = None
+        else:
+            self.W1 = rng.normal(
+                0, np.sqrt(2 / Evaluator.FEATURES), (Evaluator.FEATURES, hidden)
+            )
+            self.b1 = np.zeros(hidden)
+            self.W2 = rng.normal(0, np.sqrt(1 / hidden), (hidden, 1))
+            self.b2 = np.zeros(1)
+
+    def features(state):
+        """Compute the feature vector of a game state
+
+        Parameters:
+            state (dict): The game state object
+
+        Return:
+            features (list): A list of FEATURES floats describing the position
+
+        """
+
+        [x_dim, y_dim] = state["board_size"]
+        lines = Utils.drawn_lines(state)
+        boxes = x_dim * y_dim
+        edges = (x_dim * (y_dim + 1)) + (y_dim * (x_dim + 1))
+
+        # Count the drawn sides of every box
+        sides = {}
+        counts = [0, 0, 0, 0, 0]
+        for i in range(0, x_dim):
+            for j in range(0, y_dim):
+                x, y = ((i * 2) + 1, (j * 2) + 1)
+                n = (
+                    ((x, y - 1) in lines)
+                    + ((x, y + 1) in lines)
+                    + ((x - 1, y) in lines)
+                    + ((x + 1, y) in lines)
+                )
+                sides[(x, y)] = n
+                counts[n] += 1
+
+        # A move is safe if it does not give the opponent a box to complete
+        free = 0
+        safe = 0
+        for i in range(0, (x_dim * 2) + 1):
+            for j in range((i + 1) % 2, (y_dim * 2) + 1, 2):
+                if (i, j) in lines:
+                    continue
+                free += 1
+                if i % 2 == 1:
+                    adjacent = (sides.get((i, j - 1), 0), sides.get((i, j + 1), 0))
+                else:
+                    adjacent = (sides.get((i - 1, j), 0), sides.get((i + 1, j), 0))
+                if 2 not in adjacent:
+                    safe += 1
+
+        return [
+            free / edges,
+            counts[0] / boxes,
+            counts[1] / boxes,
+            counts[2] / boxes,
+            counts[3] / boxes,
+            safe / edges,
+            safe % 2,
+        ]
+
+    def _forward(self, X):
+        """Run the network on a batch of features
+
+        Parameters:
+            X (np.ndarray): A (batch, FEATURES) array of features
+
+        Return:
+            out (np.ndarray): The (batch,) predictions
+            hidden (np.ndarray): The hidden layer activations (None if linear)
+
+        """
+
+        if self.Hidden == 0:
+            return (X @ self.W1 + self.b1)[:, 0], None
+
+        hidden = np.maximum(X @ self.W1 + self.b1, 0)
+        return (hidden @ self.W2 + self.b2)[:, 0], hidden
+
+    def predict(self, X):
+        """Predict the boxes the player to move will net, as a fraction of the board
+
+        Parameters:
+            X (np.ndarray | list): A batch of feature vectors
+
+        Return:
+            values (np.ndarray): One prediction per feature vector
+
+        """
+
+        return self._forward(
+            np.asarray(X, dtype=float).reshape(-1, Evaluator.FEATURES)
+        )[0]
+
+    def evaluate(self, states):
+        """Predict how many boxes the player to move will net in each of the given states
+
+        Parameters:
+            states (list): The game state objects to evaluate in one batch
+
+        Return:
+            values (np.ndarray): The predicted net boxes for the player to move in each state
+
+        """
+
+        X = np.array([Evaluator.features(s) for s in states])
+        boxes = np.array([s["board_size"][0] * s["board_size"][1] for s in states])
+
+        # Nothing is left to win once every edge is drawn
+        return np.where(X[:, 0] > 0, self.predict(X) * boxes, 0.0)
+
+    def train(self, X, y, epochs=200, lr=0.01, batch=256, seed=0):
+        """Fit the weights to the given targets with mini-batch Adam on the squared error
+
+        Parameters:
+            X (np.ndarray): A (n, FEATURES) array of features
+            y (np.ndarray): The (n,) targets, as a fraction of the board's boxes
+            epochs (int): The number of passes over the data (default = 200)
+            lr (float): The learning rate (default = 0.01)
+            batch (int): The mini-batch size (default = 256)
+            seed (int): The seed used to shuffle the data (default = 0)
+
+        Return:
+            loss (float): The mean squared error over the data after training
+
+        """
+
+        rng = np.random.default_rng(seed)
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        params = [p for p in (self.W1, self.b1, self.W2, self.b2) if p is not None]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = (0.9, 0.999, 1e-8)
+        t = 0
+
+        for _ in range(0, epochs):
+            order = rng.permutation(len(X))
+            for start in range(0, len(X), batch):
+                idx = order[start : start + batch]
+                xb, yb = X[idx], y[idx]
+
+                # Backpropagate the squared error
+                out, hidden = self._forward(xb)
+                d_out = (2 * (out - yb) / len(idx))[:, None]
+                if self.Hidden == 0:
+                    grads = [xb.T @ d_out, d_out.sum(axis=0)]
+                else:
+                    d_hidden = (d_out @ self.W2.T) * (hidden > 0)
+                    grads = [
+                        xb.T @ d_hidden,
+                        d_hidden.sum(axis=0),
+                        hidden.T @ d_out,
+                        d_out.sum(axis=0),
+                    ]
+
+                # Adam update
+                t += 1
+                for i, (p, g) in enumerate(zip(params, grads)):
+                    m[i] = beta1 * m[i] + (1 - beta1) * g
+                    v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                    m_hat = m[i] / (1 - beta1**t)
+                    v_hat = v[i] / (1 - beta2**t)
+                    p -= lr * m_hat / (np.sqrt(v_hat) + eps)
+
+        return float(np.mean((self._forward(X)[0] - y) ** 2))
+
+    def digest(self):
+        """Get an identifier of the evaluator's weights
+
+        Return:
+            digest (bytes): A 16 byte hash of the weights; equal weights give equal digests
+
+        """
+
+        h = hashlib.blake2b(digest_size=16)
+        for p in (self.W1, self.b1, self.W2, self.b2):
+            if p is not None:
+                h.update(np.ascontiguousarray(p, dtype=float).tobytes())
+        return h.digest()
+
+    def save(self, file):
+        """Write the evaluator's weights in .npz format
+
+        Parameters:
+            file (str): The name of the file to write; used as given, without adding .npz
+
+        """
+
+        weights = {"W1": self.W1, "b1": self.b1}
+        if self.Hidden != 0:
+            weights.update({"W2": self.W2, "b2": self.b2})
+
+        # np.savez only adds the .npz suffix to file names, not to open files
+        with open(file, "wb") as f:
+            np.savez(f, **weights)
+
+    def load(file):
+        """Create an evaluator from weights written by save()
+
+        Parameters:
+            file (str): The name of the .npz file to read
+
+        Return:
+            evaluator (Evaluator): The evaluator holding the saved weights
+
+        """
+
+        weights = np.load(file)
+        hidden = weights["W1"].shape[1] if "W2" in weights else 0
+
+        evaluator = Evaluator(hidden)
+        evaluator.File = file
+        evaluator.W1 = weights["W1"]
+        evaluator.b1 = weights["b1"]
+        if hidden != 0:
+            evaluator.W2 = weights["W2"]
+            evaluator.b2 = weights["b2"]
+        return evaluator
@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+
+import math
+import random
+import sys
+from multiprocessing import Pool
+
+from ai import AI
+from clock import TimeManager
+from player import Player
+from utils import Utils
+
+# Hypotheses for the SPRT: H0 says engine A is ELO0 stronger than B, H1 says ELO1
+ELO0 = 0
+ELO1 = 20
+
+# Type I and type II error rates of the SPRT
+ALPHA = 0.05
+BETA = 0.05
+
+# Pseudo-count added to each pair result in the SPRT
+PSEUDO_COUNT = 0.5
+
+# Number of random moves played from the empty board to make each opening
+OPENING_PLIES = 4
+
+# Evaluators loaded by this worker process, by weights file
+_evaluators = {}
+
+
+def parse_engine(spec):
+    """Parse an engine configuration of the form "depth=3,time=0.5,weights=w.npz"
+
+    A game clock is given with "clock=<seconds>" and optionally "inc=<seconds>";
+    "depth=none" removes the depth limit. Moves slower than "slow=<seconds>" are
+    captured for replay.py.
+
+    Parameters:
+        spec (str): The engine configuration; every setting is optional
+
+    Return:
+        config (dict): The AI's depth, time limit, game clock, increment, weights file
+                       and slow move threshold
+
+    """
+
+    config = {
+        "depth": 4,
+        "time": None,
+        "clock": None,
+        "inc": 0,
+        "weights": None,
+        "slow": None,
+    }
+
+    for setting in filter(None, spec.split(",")):
+        name, _, value = setting.partition("=")
+        if name == "depth":
+            config["depth"] = None if value == "none" else int(value)
+        elif name == "time":
+            config["time"] = float(value)
+        elif name == "clock":
+            config["clock"] = float(value)
+        elif name == "inc":
+            config["inc"] = float(value)
+        elif name == "weights":
+            config["weights"] = value
+        elif name == "slow":
+            config["slow"] = float(value)
+        else:
+            raise ValueError(f"Unknown engine setting: {name}")
+
+    return config
+
+
+def make_engine(config, player_num, clock=None):
+    """Create an AI from an engine configuration
+
+    Parameters:
+        config (dict): The engine configuration from parse_engine()
+        player_num (int): The AI's number for the game
+        clock (TimeManager): The engine's game clock, if it plays with one (default = None)
+
+    Return:
+        ai (AI): The configured AI
+
+    """
+
+    evaluator = None
+    if config["weights"] is not None:
+        if config["weights"] not in _evaluators:
+            from evaluator import Evaluator
+
+            _evaluators[config["weights"]] = Evaluator.load(config["weights"])
+        evaluator = _evaluators[config["weights"]]
+
+    return AI(
+        player_num,
+        [],
+        depth=config["depth"],
+        evaluator=evaluator,
+        time_limit=config["time"],
+        clock=clock,
+        slow_move=config["slow"],
+    )
+
+
+def make_opening(size, seed):
+    """Create an opening by playing random moves that do not complete a box
+
+    Parameters:
+        size (list): The size of the board - [x_dim, y_dim]
+        seed (int): The seed for the random moves
+
+    Return:
+        state (dict): The game state after the opening moves
+
+    """
+
+    rng = random.Random(seed)
+    state = {"board_size": size, "player": 1, 1: [], 2: []}
+
+    for _ in range(0, OPENING_PLIES):
+        moves = [
+            m for m in Utils.valid_moves(state) if Utils.is_completion(state, m) == 0
+        ]
+        if len(moves) == 0:
+            break
+        state[state["player"]] = state[state["player"]] + [rng.choice(moves)]
+        state["player"] = 1 if state["player"] == 2 else 2
+
+    return state
+
+
+def play_engines(state, engines):
+    """Play a game between two engines from the given state
+
+    Parameters:
+        state (dict): The game state to start from
+        engines (dict): The configuration of the engine playing each player number
+
+    Return:
+        scores (dict): The number of boxes each player number completed
+
+    """
+
+    scores = {1: 0, 2: 0}
+
+    # Each engine's game clock runs for the whole game
+    clocks = {}
+    for num, config in engines.items():
+        if config["clock"] is not None:
+            clocks[num] = TimeManager(config["clock"], config["inc"])
+
+    while True:
+        moves = Utils.valid_moves(state)
+        if Utils.terminal_test(state, moves):
+            break
+
+        p = state["player"]
+        o = 1 if p == 2 else 2
+
+        # The opponent is given to the AI as a Player carrying their score
+        ai = make_engine(engines[p], p, clocks.get(p))
+        ai.set_score(scores[p])
+        opp = Player(o, positions=state[o])
+        opp.set_score(scores[o])
+        [move, _] = ai.get_move(state, opp)
+
+        state, completions = Utils.make_move(state, move, Player(p), 0, scores[p])
+        scores[p] += completions
+
+        # The player keeps their turn after a completion
+        if completions == 0:
+            state["player"] = o
+
+    return scores
+
+
+def play_pair(args):
+    """Play an opening twice, with engine A moving first in one game and second in the other
+
+    Parameters:
+        args (tuple): (board size (list), opening seed (int), engine A (dict), engine B (dict))
+
+    Return:
+        results (list): Engine A's result in each game; 1 for a win, 0.5 for a draw, 0 for a loss
+
+    """
+
+    size, seed, engine_a, engine_b = args
+    opening = make_opening(size, seed)
+    results = []
+
+    for a_num in (1, 2):
+        b_num = 1 if a_num == 2 else 2
+        scores = play_engines(dict(opening), {a_num: engine_a, b_num: engine_b})
+        if scores[a_num] > scores[b_num]:
+            results.append(1)
+        elif scores[a_num] == scores[b_num]:
+            results.append(0.5)
+        else:
+            results.append(0)
+
+    return results
+
+
+def expected_score(elo):
+    """Convert an Elo difference into an expected score
+
+    Parameters:
+        elo (float): The Elo difference
+
+    Return:
+        score (float): The expected score of the stronger side, between 0 and 1
+
+    """
+
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo(score):
+    """Convert an expected score into an Elo difference
+
+    Parameters:
+        score (float): The expected score, between 0 and 1
+
+    Return:
+        elo (float): The Elo difference
+
+    """
+
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10((1 / score) - 1)
+
+
+def sprt(pairs):
+    """Compute the log-likelihood ratio of H1 against H0 from the game pairs played so far
+
+    Each pair is treated as one sample, so the correlation between the two games of an
+    opening is accounted for (the pentanomial model). PSEUDO_COUNT is added to each of
+    the five possible pair results, so one-sided results still have a variance and
+    can be decided.
+
+    Parameters:
+        pairs (list): The (A's score in game 1 + A's score in game 2) of every pair
+
+    Return:
+        llr (float): The log-likelihood ratio
+        mean (float): The mean score of engine A per game
+        var (float): The variance of the per-game score of a pair
+
+    """
+
+    # Count each pair result (0, 0.5, 1, 1.5 or 2 points), regularized
+    counts = [PSEUDO_COUNT] * 5
+    for p in pairs:
+        counts[int(p * 2)] += 1
+
+    n = sum(counts)
+    mean = sum(c * (i / 4) for i, c in enumerate(counts)) / n
+    var = sum(c * ((i / 4) - mean) ** 2 for i, c in enumerate(counts)) / n
+
+    s0, s1 = (expected_score(ELO0), expected_score(ELO1))
+    llr = (s1 - s0) * ((2 * mean) - s0 - s1) * n / (2 * var)
+    return llr, mean, var
+
+
+def run_match(size, engine_a, engine_b, max_pairs=1000, seed=0):
+    """Play pairs of games between two engines in parallel until the SPRT is decided
+
+    Parameters:
+        size (list): The size of the board - [x_dim, y_dim]
+        engine_a (dict): The configuration of engine A
+        engine_b (dict): The configuration of engine B
+        max_pairs (int): The number of pairs to stop after if the SPRT is undecided (default = 1000)
+        seed (int): The seed for the openings (default = 0)
+
+    Return:
+        result (str): "H1" if A is stronger, "H0" if it is not, or "undecided"
+
+    """
+
+    lower = math.log(BETA / (1 - ALPHA))
+    upper = math.log((1 - BETA) / ALPHA)
+    pairs = []
+    wins, draws, losses = 0, 0, 0
+    result = "undecided"
+
+    jobs = ((size, seed + i, engine_a, engine_b) for i in range(0, max_pairs))
+    with Pool() as pool:
+        # Results are taken in pair order, so games that finish sooner can't bias
+        # an early stop; the pairs are still played in parallel
+        for games in pool.imap(play_pair, jobs):
+            pairs.append(sum(games))
+            wins += games.count(1)
+            draws += games.count(0.5)
+            losses += games.count(0)
+
+            llr, mean, var = sprt(pairs)
+            print(
+                f"Pairs: {len(pairs)} | W-D-L: {wins}-{draws}-{losses} | "
+                f"LLR: {llr:.2f} [{lower:.2f}, {upper:.2f}]"
+            )
+
+            if llr >= upper:
+                result = "H1"
+                break
+            if llr <= lower:
+                result = "H0"
+                break
+
+    print(f"\nResult: {result} (H0: {ELO0} Elo, H1: {ELO1} Elo)")
+    if len(pairs) == 0:
+        print("Elo: n/a (no pairs were played)")
+        return result
+
+    # Elo with a 95% confidence interval from the variance of the pairs
+    margin = 1.96 * math.sqrt(var / len(pairs))
+    error = (elo(mean + margin) - elo(mean - margin)) / 2
+    print(f"Elo: {elo(mean):+.1f} +/- {error:.1f}")
+
+    return result
+
+
+def main():
+    """Main function for the match harness; Collect the CLAs and run the match"""
+
+    # Verify command-line argument count
+    if not (4 <= len(sys.argv) <= 5):
+        print(
+            f"Usage: {sys.argv[0]} <board size (N or MxN)> <engine A> <engine B> [max pairs]"
+        )
+        print('Engines are configured as e.g. "depth=3,time=0.5,weights=w.npz"')
+        exit(-1)
+
+    dims = [int(d) for d in sys.argv[1].lower().split("x")]
+    size = dims * 2 if len(dims) == 1 else dims
+    max_pairs = int(sys.argv[4]) if len(sys.argv) == 5 else 1000
+
+    run_match(size, parse_engine(sys.argv[2]), parse_engine(sys.argv[3]), max_pairs)
+
+
+if __name__ == "__main__":
+    exit(main())
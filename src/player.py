@@ -73,12 +73,8 @@ class Player:
                 continue
 
             # check that the input is only integer values
-            for s in move:
-                if not (
-                    s.isdigit()
-                    and int(s) >= 0
-                    and int(s) <= (state["board_size"][0] * 2) + 1
-                ):
+            for s, dim in zip(move, state["board_size"]):
+                if not (s.isdigit() and int(s) >= 0 and int(s) <= dim * 2):
                     print(
                         "Please only enter integer values in the proper range of the board."
                     )
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import cProfile
+import pstats
+import sys
+import time
+
+from ai import AI
+from capture import load_capture
+from player import Player
+from transposition import TranspositionTable
+
+# Number of functions listed in each profile
+PROFILE_LINES = 25
+
+
+def replay(file, sort="tottime"):
+    """Re-run the AI's search on a captured slow move under cProfile and print a
+    per-function breakdown of where the time went
+
+    Parameters:
+        file (str): The name of the capture's state file
+        sort (str): The pstats key to sort the functions by (default = "tottime")
+
+    Return:
+        move (tuple): The move the AI chose in the replay, or () if no iteration finished
+
+    """
+
+    state, sidecar = load_capture(file)
+    ai_num = sidecar["ai_player"]
+    opp_num = 1 if ai_num == 2 else 2
+
+    # Rebuild the AI with the settings it had when the move was captured
+    evaluator = None
+    if sidecar["weights"] is not None:
+        from evaluator import Evaluator
+
+        evaluator = Evaluator.load(sidecar["weights"])
+
+    # The original table's contents are gone, so an empty one is used
+    table = TranspositionTable() if sidecar["table"] else None
+
+    ai = AI(ai_num, state[ai_num], table, evaluator=evaluator)
+    ai.set_score(sidecar["ai_score"])
+    opp = Player(opp_num, positions=state[opp_num])
+    opp.set_score(sidecar["opp_score"])
+
+    # The captured search's iterations are replayed one depth at a time, without a
+    # time limit or clock since the profiler slows the search down; the table carries
+    # each iteration's best moves into the next, as it did in the captured search
+    depth = sidecar["completed_depth"]
+    deepened = sidecar["time_limit"] is not None or sidecar["clock"] is not None
+    iterations = [(d, None) for d in range(1 if deepened else depth, depth + 1)]
+
+    # The iteration the deadline stopped is cut off after as many nodes as it visited
+    if sidecar["partial_nodes"] > 0:
+        iterations.append((depth + 1, sidecar["partial_nodes"]))
+
+    profile = cProfile.Profile()
+    move = ()
+    start = time.perf_counter()
+    profile.enable()
+    for d, nodes in iterations:
+        ai.Depth = d
+        ai.Node_limit = nodes
+        result = ai.search(state, opp)
+        if nodes is None:
+            move = result[0]
+    profile.disable()
+    elapsed = time.perf_counter() - start
+
+    if table is not None:
+        table.close()
+
+    print(f"Capture: {file}")
+    print(f"Captured move: {tuple(sidecar['move'])} in {sidecar['elapsed']:.3f}s")
+    partial = ""
+    if sidecar["partial_nodes"] > 0:
+        partial = f" and {sidecar['partial_nodes']} nodes of depth {depth + 1}"
+    print(
+        f"Replayed move: {move} at depth {depth}{partial} "
+        f"in {elapsed:.3f}s (under the profiler)\n"
+    )
+    pstats.Stats(profile).strip_dirs().sort_stats(sort).print_stats(PROFILE_LINES)
+
+    return move
+
+
+def main():
+    """Main function for replays; Collect the CLAs and replay every capture given"""
+
+    # Verify command-line argument count
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <capture file> [capture file ...]")
+        exit(-1)
+
+    for file in sys.argv[1:]:
+        replay(file)
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+import random
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+from ai import AI
+from evaluator import Evaluator
+from player import Player
+from transposition import TranspositionTable
+from utils import Utils
+
+
+def close_targets(positions, scores, to_move, estimate, boxes):
+    """Turn recorded positions into training targets once their outcome is known
+
+    Parameters:
+        positions (list): The (features, player to move, margin for that player) of
+                          every position since the outcome was last cut off
+        scores (dict): Each player number's score where the outcome is cut off
+        to_move (int): The player to move where the outcome is cut off
+        estimate (float): The net boxes to_move is expected to win from there on
+        boxes (int): The number of boxes on the board
+
+    Return:
+        features (list): The feature vector of every position
+        targets (list): The boxes the player to move netted from each position, as a
+                        fraction of the board's boxes
+
+    """
+
+    features = []
+    targets = []
+    for f, p, margin in positions:
+        o = 1 if p == 2 else 2
+        rest = estimate if p == to_move else -estimate
+        features.append(f)
+        targets.append(((scores[p] - scores[o]) + rest - margin) / boxes)
+
+    return features, targets
+
+
+def self_play(args):
+    """Play one game of the AI against itself and record the positions it went through
+
+    Each position's target is the number of boxes the player to move went on to net
+    while both sides were searching. A random move cuts the outcome off: positions
+    before it are scored up to that point plus the current evaluator's estimate of
+    the rest of the game, and the random move's own position is not recorded.
+
+    Parameters:
+        args (tuple): (board size (int), search depth (int), chance of a random move (float),
+                       seed (int), table (TranspositionTable), evaluator (Evaluator | None))
+
+    Return:
+        features (list): The feature vector of every recorded position
+        targets (list): The boxes the player to move netted from each position, as a
+                        fraction of the board's boxes
+
+    """
+
+    size, depth, epsilon, seed, table, evaluator = args
+    rng = random.Random(seed)
+    boxes = size * size
+
+    state = {"board_size": [size, size], "player": 1, 1: [], 2: []}
+    scores = {1: 0, 2: 0}
+    positions = []
+    features = []
+    targets = []
+
+    while True:
+        moves = Utils.valid_moves(state)
+        if Utils.terminal_test(state, moves):
+            break
+
+        p = state["player"]
+        o = 1 if p == 2 else 2
+
+        # Search for the move, with occasional random moves to vary the games
+        if rng.random() < epsilon:
+            estimate = 0.0
+            if evaluator is not None:
+                estimate = float(evaluator.evaluate([state])[0])
+            f, t = close_targets(positions, scores, p, estimate, boxes)
+            features.extend(f)
+            targets.extend(t)
+            positions = []
+
+            move = rng.choice(moves)
+        else:
+            positions.append((Evaluator.features(state), p, scores[p] - scores[o]))
+
+            ai = AI(p, state[p], table, depth, evaluator)
+            ai.set_score(scores[p])
+            opp = Player(o, positions=state[o])
+            opp.set_score(scores[o])
+            [move, _] = ai.get_move(state, opp)
+
+        mover = Player(p)
+        state, completions = Utils.make_move(state, move, mover, 0, scores[p])
+        scores[p] += completions
+
+        # The player keeps their turn after a completion
+        if completions == 0:
+            state["player"] = o
+
+    f, t = close_targets(positions, scores, state["player"], 0.0, boxes)
+    features.extend(f)
+    targets.extend(t)
+
+    return features, targets
+
+
+def train(size, games, weights, depth=2, generations=3, hidden=16):
+    """Train an evaluator on self-play games, feeding each generation's weights back
+    into the next generation's searches
+
+    Parameters:
+        size (int): The size of the board to play on
+        games (int): The number of self-play games per generation
+        weights (str): The name of the .npz file to export the weights to
+        depth (int): The search depth used to pick self-play moves (default = 2)
+        generations (int): The number of generate/train rounds (default = 3)
+        hidden (int): The number of hidden units; 0 for a linear evaluator (default = 16)
+
+    Return:
+        evaluator (Evaluator): The trained evaluator
+
+    """
+
+    table = TranspositionTable()
+    evaluator = None
+    X = []
+    y = []
+
+    with Pool() as pool:
+        for gen in range(0, generations):
+            # Cached values depend on the evaluator, so they are dropped each generation
+            table.clear()
+            jobs = [
+                (size, depth, 0.1, (gen * games) + i, table, evaluator)
+                for i in range(0, games)
+            ]
+            for features, targets in pool.imap_unordered(self_play, jobs):
+                X.extend(features)
+                y.extend(targets)
+
+            evaluator = Evaluator(hidden, seed=gen)
+            loss = evaluator.train(np.array(X), np.array(y))
+            evaluator.save(weights)
+            print(f"Generation {gen + 1}: {len(X)} positions, loss {loss:.4f}")
+
+    table.close()
+    return evaluator
+
+
+def main():
+    """Main function for training; Collect the CLAs and run the training pipeline"""
+
+    # Verify command-line argument count
+    if not (4 <= len(sys.argv) <= 7):
+        print(
+            f"Usage: {sys.argv[0]} <board size> <games> <weights file> "
+            "[depth] [generations] [hidden units]"
+        )
+        exit(-1)
+
+    args = [int(a) for a in sys.argv[4:]]
+    train(int(sys.argv[1]), int(sys.argv[2]), sys.argv[3], *args)
+
+
+if __name__ == "__main__":
+    exit(main())
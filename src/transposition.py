@@ -0,0 +1,346 @@
+import contextlib
+import os
+import random
+import struct
+from multiprocessing import shared_memory
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Largest board dimension the hash keys are generated for (12x12 boxes)
+MAX_DIM = 12
+
+# Zobrist keys are generated from a fixed seed so every process agrees on them
+_rng = random.Random(0xDAB)
+LINE_KEYS = {}
+for x in range(0, (MAX_DIM * 2) + 1):
+    for y in range(0, (MAX_DIM * 2) + 1):
+        LINE_KEYS[(x, y)] = _rng.getrandbits(64)
+SCORE_KEYS = [
+    [_rng.getrandbits(64) for _ in range(0, (MAX_DIM * MAX_DIM) + 1)]
+    for _ in range(0, 4)
+]
+MAXIMIZE_KEY = _rng.getrandbits(64)
+DIM_KEYS = [[_rng.getrandbits(64) for _ in range(0, MAX_DIM + 1)] for _ in range(0, 2)]
+
+
+class TranspositionTable:
+    """Class to represent a transposition table that can be shared between processes
+
+    The table is a fixed-size array of 16 byte entries stored in a block of shared
+    memory. Each entry holds a packed data word and a check word (key XOR data), so
+    entries can be probed and stored without locks; a torn or overwritten entry
+    simply fails the check on the next probe.
+
+    Attributes:
+        Entries (int): The number of entries in the table (always a power of two)
+        Name (str): The name of the shared memory block backing the table
+        Owner (bool): Whether this process created the shared memory block
+        Shm (SharedMemory): The shared memory block holding the entries
+
+    """
+
+    # Bound types stored with each entry
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    ENTRY = struct.Struct("<QQ")
+    MAGIC = b"DABTT003"
+
+    # Files record the board size and the evaluator weights their values were found
+    # with, and are only loaded for the same ones
+    HEADER = struct.Struct("<8sQHH16s")
+
+    # The data word holds the value as a float32 in its low half; the high half packs
+    # the depth (16 bits), the move's x + 1 and y + 1 (5 bits each, 0 for no move)
+    # and the flag (2 bits)
+    DATA = struct.Struct("<fI")
+
+    def __init__(self, entries=1 << 20, name=None):
+        """Create a new table or attach to an existing one
+
+        Parameters:
+            entries (int): The number of entries; rounded up to a power of two (default = 2^20)
+            name (str): The name of an existing shared memory block to attach to (default = None)
+
+        """
+
+        self.Entries = 1 << max(0, int(entries) - 1).bit_length()
+
+        if name is None:
+            self.Shm = shared_memory.SharedMemory(
+                create=True, size=self.Entries * self.ENTRY.size
+            )
+            self.Owner = True
+        else:
+            self.Shm = TranspositionTable._attach(name)
+            self.Owner = False
+
+        self.Name = self.Shm.name
+
+    def _attach(name):
+        """Attach to an existing shared memory block without taking ownership of it
+
+        Parameters:
+            name (str): The name of the shared memory block
+
+        Return:
+            shm (SharedMemory): The attached shared memory block
+
+        """
+
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 always tracks the block, but worker processes share
+            # the creating process's resource tracker so it is still freed once
+            return shared_memory.SharedMemory(name=name)
+
+    def __reduce__(self):
+        """Pickle the table by name so worker processes attach to the same memory"""
+
+        return (TranspositionTable, (self.Entries, self.Name))
+
+    def hash_state(state, maximize, scores):
+        """Compute the key of a search node
+
+        Parameters:
+            state (dict): The game state object
+            maximize (bool): Whether the node is a maximizing node
+            scores (tuple): The (AI score, opponent score, AI root score, opponent root score)
+                            that the value of the node depends on
+
+        Return:
+            key (int): A non-zero 64 bit key for the node
+
+        """
+
+        [x_dim, y_dim] = state["board_size"]
+        key = DIM_KEYS[0][x_dim] ^ DIM_KEYS[1][y_dim]
+        if maximize:
+            key ^= MAXIMIZE_KEY
+
+        for line in state[1]:
+            key ^= LINE_KEYS[line]
+        for line in state[2]:
+            key ^= LINE_KEYS[line]
+
+        for i, score in enumerate(scores):
+            key ^= SCORE_KEYS[i][score]
+
+        return key or 1
+
+    def probe(self, key):
+        """Look up an entry in the table
+
+        Parameters:
+            key (int): The key of the search node
+
+        Return:
+            None if the node is not in the table, otherwise
+            (depth (int), value (float), move (tuple), flag (int))
+
+        """
+
+        offset = (key & (self.Entries - 1)) * self.ENTRY.size
+        check, data = self.ENTRY.unpack_from(self.Shm.buf, offset)
+
+        if check ^ data != key:
+            return None
+
+        value, meta = self.DATA.unpack(data.to_bytes(8, "little"))
+        depth = meta & 0xFFFF
+        x = ((meta >> 16) & 0x1F) - 1
+        y = ((meta >> 21) & 0x1F) - 1
+        flag = meta >> 26
+        move = () if x < 0 else (x, y)
+        return depth, value, move, flag
+
+    def store(self, key, depth, value, move, flag):
+        """Store an entry in the table, replacing whatever was in its slot
+
+        Parameters:
+            key (int): The key of the search node
+            depth (int): The remaining depth the node was searched to
+            value (int | float): The value found for the node
+            move (tuple): The best move found for the node, or () if there is none
+            flag (int): One of EXACT, LOWER or UPPER
+
+        """
+
+        x, y = move if move else (-1, -1)
+        meta = depth | ((x + 1) << 16) | ((y + 1) << 21) | (flag << 26)
+        data = int.from_bytes(self.DATA.pack(value, meta), "little")
+        offset = (key & (self.Entries - 1)) * self.ENTRY.size
+        self.ENTRY.pack_into(self.Shm.buf, offset, key ^ data, data)
+
+    def clear(self):
+        """Remove every entry from the table"""
+
+        self.Shm.buf[: self.Entries * self.ENTRY.size] = bytes(
+            self.Entries * self.ENTRY.size
+        )
+
+    def _header(entries, board_size, evaluator):
+        """Pack the header of a table file
+
+        Parameters:
+            entries (int): The number of entries in the table
+            board_size (list): The size of the board the table was searched on - [x_dim, y_dim]
+            evaluator (Evaluator): The evaluator the values were found with, or None
+
+        Return:
+            header (bytes): The packed header
+
+        """
+
+        [x_dim, y_dim] = board_size
+        digest = bytes(16) if evaluator is None else evaluator.digest()
+        return TranspositionTable.HEADER.pack(
+            TranspositionTable.MAGIC, entries, x_dim, y_dim, digest
+        )
+
+    def _read(file, board_size, evaluator, entries=None):
+        """Read the entries of a file written by save()
+
+        Parameters:
+            file (str): The name of the file to read
+            board_size (list): The size of the board the table will be searched on - [x_dim, y_dim]
+            evaluator (Evaluator): The evaluator the table will be used with, or None
+            entries (int): The number of entries to read them into (default = the saved size)
+
+        Return:
+            entries (int): The number of entries read into
+            buf (bytearray): The entries, each in its slot for that number of entries
+
+        """
+
+        with open(file, "rb") as f:
+            header = f.read(TranspositionTable.HEADER.size)
+            if len(header) < TranspositionTable.HEADER.size or header[:8] != (
+                TranspositionTable.MAGIC
+            ):
+                raise ValueError(f"{file} is not a transposition table file")
+
+            saved = TranspositionTable.HEADER.unpack(header)[1]
+            if header != TranspositionTable._header(saved, board_size, evaluator):
+                raise ValueError(
+                    f"{file} was saved for a different board size or evaluator"
+                )
+
+            # A buffer of the saved size can take the entries as-is
+            raw = f.read(saved * TranspositionTable.ENTRY.size)
+            if entries is None or entries == saved:
+                return saved, bytearray(raw)
+
+        # Otherwise the saved entries are re-inserted into their new slots
+        buf = bytearray(entries * TranspositionTable.ENTRY.size)
+        for check, data in TranspositionTable.ENTRY.iter_unpack(raw):
+            if check == data:
+                continue
+            offset = ((check ^ data) & (entries - 1)) * TranspositionTable.ENTRY.size
+            TranspositionTable.ENTRY.pack_into(buf, offset, check, data)
+
+        return entries, buf
+
+    def save(self, file, board_size, evaluator=None):
+        """Merge the contents of the table into a file, creating it if needed
+
+        An entry already in the file is only replaced by one of this table's that was
+        searched at least as deep, so processes saving to the same file keep each
+        other's results. The file is written under a temporary name and then swapped
+        in, so a process loading it never sees it half written.
+
+        Parameters:
+            file (str): The name of the file to write
+            board_size (list): The size of the board the table was searched on - [x_dim, y_dim]
+            evaluator (Evaluator): The evaluator the values were found with (default = None)
+
+        """
+
+        size = self.Entries * self.ENTRY.size
+        merged = bytearray(self.Shm.buf[:size])
+
+        with TranspositionTable._lock(file):
+            if os.path.exists(file):
+                _, saved = TranspositionTable._read(
+                    file, board_size, evaluator, self.Entries
+                )
+                for i, (check, data) in enumerate(self.ENTRY.iter_unpack(saved)):
+                    if check == data:
+                        continue
+                    offset = i * self.ENTRY.size
+                    own_check, own_data = self.ENTRY.unpack_from(merged, offset)
+                    if (
+                        own_check == own_data
+                        or (data >> 32) & 0xFFFF > (own_data >> 32) & 0xFFFF
+                    ):
+                        self.ENTRY.pack_into(merged, offset, check, data)
+
+            temp = f"{file}.{os.getpid()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(TranspositionTable._header(self.Entries, board_size, evaluator))
+                f.write(merged)
+            os.replace(temp, file)
+
+    @contextlib.contextmanager
+    def _lock(file):
+        """Hold an exclusive lock on a table file while it is merged into
+
+        Parameters:
+            file (str): The name of the table file
+
+        """
+
+        with open(file + ".lock", "a") as f:
+            # Without fcntl (e.g. on Windows) concurrent saves are not serialized
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def load(file, board_size, evaluator=None, entries=None):
+        """Create a new table warm-started from a file written by save()
+
+        Parameters:
+            file (str): The name of the file to read
+            board_size (list): The size of the board the table will be searched on - [x_dim, y_dim]
+            evaluator (Evaluator): The evaluator the table will be used with (default = None)
+            entries (int): The number of entries for the new table (default = the saved size)
+
+        Return:
+            table (TranspositionTable): The new table holding the saved entries
+
+        """
+
+        entries, buf = TranspositionTable._read(file, board_size, evaluator, entries)
+        table = TranspositionTable(entries)
+        table.Shm.buf[: len(buf)] = buf
+        return table
+
+    def load_or_create(file, board_size, evaluator=None, entries=1 << 20):
+        """Warm-start a table from a file if it exists, otherwise create an empty one
+
+        Parameters:
+            file (str): The name of the file to read
+            board_size (list): The size of the board the table will be searched on - [x_dim, y_dim]
+            evaluator (Evaluator): The evaluator the table will be used with (default = None)
+            entries (int): The number of entries for a new table (default = 2^20)
+
+        Return:
+            table (TranspositionTable): The new table
+
+        """
+
+        if os.path.exists(file):
+            return TranspositionTable.load(file, board_size, evaluator)
+        return TranspositionTable(entries)
+
+    def close(self):
+        """Detach from the shared memory; the creating process also frees it"""
+
+        self.Shm.close()
+        if self.Owner:
+            self.Shm.unlink()
@@ -1,9 +1,59 @@
 import sys
-from copy import deepcopy
+
+# Every line of each board size searched so far, by (x_dim, y_dim)
+_all_lines = {}
 
 
 class Utils:
-    """Library class with useful functions for the project"""
+    """Library class with useful functions for the project
+
+    Besides the board size, whose turn it is and each player's list of lines, a game
+    state made by make_move() carries a "lines" entry: the set of all drawn lines,
+    which is updated with each move instead of being rebuilt from the lists.
+    """
+
+    def drawn_lines(state):
+        """Get the set of lines drawn by either player
+
+        Parameters:
+            state (dict): The game state object
+
+        Return:
+            lines (frozenset): Every line in the state's two lists of lines
+
+        """
+
+        lines = state.get("lines")
+
+        # States that were not made by make_move() (or whose lists were changed
+        # afterwards) have their set built from the lists
+        if lines is None or len(lines) != len(state[1]) + len(state[2]):
+            lines = frozenset(state[1]) | frozenset(state[2])
+        return lines
+
+    def all_lines(board_size):
+        """Get every line on a board, drawn or not
+
+        Parameters:
+            board_size (list): The size of the board - [x_dim, y_dim]
+
+        Return:
+            lines (list): A list of tuples where each tuple is a line (x,y)
+
+        """
+
+        [x_dim, y_dim] = board_size
+        lines = _all_lines.get((x_dim, y_dim))
+
+        # Lines have one odd and one even coordinate
+        if lines is None:
+            lines = [
+                (i, j)
+                for i in range(0, (x_dim * 2) + 1)
+                for j in range((i + 1) % 2, (y_dim * 2) + 1, 2)
+            ]
+            _all_lines[(x_dim, y_dim)] = lines
+        return lines
 
     def is_completion(state, move):
         """Checks if a move makes a completion and counts how many completions are made
@@ -18,8 +68,8 @@ class Utils:
         """
 
         completions = 0
-        lines = set(state[1]) | set(state[2])
-        (x, y) = move
+        lines = Utils.drawn_lines(state)
+        x, y = move
 
         # Horizontal Line
         if x % 2 == 1:
@@ -73,9 +123,12 @@ class Utils:
 
         """
 
-        result = deepcopy(state)
+        # Only the mover's list of lines and the set of drawn lines change, so the
+        # rest of the state is shared
+        result = dict(state)
         completions = Utils.is_completion(state, move)
-        result[result["player"]].append(move)
+        result[result["player"]] = state[result["player"]] + [move]
+        result["lines"] = Utils.drawn_lines(state) | {move}
 
         if player.get_nick() == "AI":
             total = ai_prev_score + completions
@@ -112,22 +165,71 @@ class Utils:
 
         """
 
-        result = []
+        # Every line on the board that is not already taken in the game state
+        lines = Utils.drawn_lines(state)
+        return [m for m in Utils.all_lines(state["board_size"]) if m not in lines]
+
+    def classify_moves(state, moves):
+        """Split moves into those that complete a box, those that do not give the
+        opponent a box, and the rest (sacrifices)
+
+        Parameters:
+            state (dict): The current game state object
+            moves (list): The valid moves in the game state
+
+        Return:
+            captures (list): The moves that complete at least one box
+            safe (list): The moves that do not leave a box with three sides drawn
+            rest (list): The moves that leave a box for the opponent to complete
+
+        """
+
+        lines = Utils.drawn_lines(state)
         [x_dim, y_dim] = state["board_size"]
+        captures = []
+        safe = []
+        rest = []
+
+        for x, y in moves:
+            # The boxes on either side of the line, identified by their centers
+            if x % 2 == 1:
+                boxes = [(x, y - 1), (x, y + 1)]
+            else:
+                boxes = [(x - 1, y), (x + 1, y)]
+
+            sides = [
+                ((bx, by - 1) in lines)
+                + ((bx, by + 1) in lines)
+                + ((bx - 1, by) in lines)
+                + ((bx + 1, by) in lines)
+                for (bx, by) in boxes
+                if 0 < bx < x_dim * 2 and 0 < by < y_dim * 2
+            ]
+
+            if 3 in sides:
+                captures.append((x, y))
+            elif 2 in sides:
+                rest.append((x, y))
+            else:
+                safe.append((x, y))
+
+        return captures, safe, rest
+
+    def order_moves(state, moves):
+        """Order moves so that the best candidates are searched first: moves that
+        complete a box, then moves that do not give the opponent a box, then the rest
+
+        Parameters:
+            state (dict): The current game state object
+            moves (list): The valid moves in the game state
+
+        Return:
+            result (list): The same moves in search order
 
-        # Create a list of all possible moves regardless of the state
-        for i in range(0, (x_dim * 2) + 1):
-            for j in range(0, (y_dim * 2) + 1):
-                if (i % 2 == 0 and j % 2 == 1) or i % 2 == 1 and j % 2 == 0:
-                    result.append((i, j))
+        """
 
-        # Remove any moves that are already taken in the game state
-        result = [
-            m
-            for m in result
-            if (m not in state[1]) and (m not in state[2]) and m != ("0", "0")
-        ]
-        return result
+        captures, safe, rest = Utils.classify_moves(state, moves)
+        return captures + safe + rest
 
     def process_data(data, line, player_num):
         """Process given data and add the player's current positions to the state
@@ -207,3 +309,20 @@ class Utils:
             data["player"] = 2
 
         return data
+
+    def write_state_file(file, state):
+        """Write a game state to a file in the format read by read_state_file
+
+        Parameters:
+            file (str): The name of the file to write
+            state (dict): The game state object
+
+        """
+
+        [x_dim, y_dim] = state["board_size"]
+
+        with open(file, "w") as f:
+            f.write(f"B={x_dim}x{y_dim}\n")
+            for player_num in (1, 2):
+                positions = " ".join(f"({x},{y})" for (x, y) in state[player_num])
+                f.write(f"p{player_num}: {positions}\n")